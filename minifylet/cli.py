@@ -10,15 +10,18 @@ Usage:
     minifylet bookmarket.js bookmarket.min.js
 
 """
-import urllib.parse
-import re
 import argparse
+import atexit
+import concurrent.futures
+import functools
+import json
 import logging
+import os
+import pathlib
 import sys
 import subprocess
 import shutil
-import os
-import tempfile
+import re
 
 
 # Configure logging
@@ -26,50 +29,353 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 # Safe chars: All printable ASCII except space, %, and # (which starts a fragment)
-SAFE_CHARS = "".join(
-    [chr(i) for i in range(33, 127) if chr(i) not in ["%", " ", "#"]]
+_UNSAFE_CHARS = frozenset("% #")
+SAFE_CHARS = "".join(chr(i) for i in range(33, 127) if chr(i) not in _UNSAFE_CHARS)
+_SAFE_SET = frozenset(SAFE_CHARS)
+
+# A structural char
+_STRUCT = r"([\{\}\(\)\[\]\=\+\-\*\/\;\:\,\<\>])"
+
+# Single-pass whitespace pattern, compiled once at import:
+# whitespace with an optional structural char (and whitespace) after it,
+# or a structural char with whitespace after it.
+# Structural chars with no whitespace on either side are not matched at all.
+_MINIFY = re.compile(rf"\s+(?:{_STRUCT}\s*)?|{_STRUCT}\s+")
+
+# Chars after which a / starts a regex literal rather than a division
+_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+
+# Keywords after which a / starts a regex literal
+_REGEX_KEYWORDS = frozenset(
+    "await case delete do else in instanceof new of return throw typeof void "
+    "yield".split()
+)
+
+# Keywords whose (...) is followed by a statement, which may start with a regex
+_PAREN_KEYWORDS = frozenset(["if", "while", "for", "with"])
+
+# Percent escapes for the ASCII chars not in SAFE_CHARS.
+# '%' comes first so that the escapes inserted after it are not re-escaped.
+_ASCII_ESCAPES = sorted(
+    [(chr(i), f"%{i:02X}") for i in range(128) if chr(i) not in _SAFE_SET],
+    key=lambda escape: escape[0] != "%",
 )
 
+# Runs of non-ASCII chars, all of whose UTF-8 bytes must be escaped
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+
+
+# Node.js script that reads "<byte length>\n<code>" frames from stdin and
+# replies with "OK" or "ERR:<JSON error message>" on stdout, one line each.
+# The code is compiled as a function body, like `node --check` does.
+_NODE_CHECKER_JS = r"""
+const vm = require('vm');
+let buffer = Buffer.alloc(0);
+process.stdin.on('data', (chunk) => {
+  buffer = Buffer.concat([buffer, chunk]);
+  for (;;) {
+    const newline = buffer.indexOf(10);
+    if (newline < 0) break;
+    const start = newline + 1;
+    const end = start + parseInt(buffer.toString('ascii', 0, newline), 10);
+    if (buffer.length < end) break;
+    const code = buffer.toString('utf8', start, end);
+    buffer = buffer.subarray(end);
+    try {
+      vm.compileFunction(code);
+      process.stdout.write('OK\n');
+    } catch (e) {
+      process.stdout.write('ERR:' + JSON.stringify(String(e)) + '\n');
+    }
+  }
+});
+"""
+
+
+class _NodeChecker:
+    """
+    A long-lived Node.js process for checking JavaScript syntax.
 
-def check_syntax(js_code):
+    Starting node takes much longer than parsing a bookmarklet, so one
+    process is reused for every check instead of running `node --check`
+    each time.
+    """
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ["node", "-e", _NODE_CHECKER_JS],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def check(self, js_code):
+        """
+        Returns None if the code is valid, or else the syntax error message.
+        """
+        data = js_code.encode("utf-8")
+        try:
+            self.process.stdin.write(b"%d\n" % len(data) + data)
+            self.process.stdin.flush()
+            reply = self.process.stdout.readline().decode("utf-8")
+        except BrokenPipeError:
+            reply = ""
+        if not reply:
+            raise RuntimeError("Node.js syntax checker exited unexpectedly")
+        if reply.startswith("OK"):
+            return None
+        return json.loads(reply[len("ERR:"):])
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_node_checker = None
+_node_checker_pid = None
+
+
+def _get_node_checker():
+    """
+    Returns the _NodeChecker for this process, starting it on first use.
+
+    A forked child, such as a minify_many worker, starts its own checker
+    instead of sharing the parent's pipes. A checker whose node process
+    has exited is replaced as well.
+    """
+    global _node_checker, _node_checker_pid
+    if (
+        _node_checker is None
+        or _node_checker_pid != os.getpid()
+        or _node_checker.process.poll() is not None
+    ):
+        _node_checker = _NodeChecker()
+        _node_checker_pid = os.getpid()
+        atexit.register(_node_checker.close)
+    return _node_checker
+
+
+def check_syntax(js_code, source=None):
     """
     Checks the syntax of the JavaScript code using Node.js.
+
+    source names the file the code came from in the error message.
     """
     if not shutil.which("node"):
         logger.error("Node.js is not installed. Cannot check syntax.")
         return False
 
-    with tempfile.NamedTemporaryFile(suffix='.js', mode='w', delete=False) as tmp:
-        tmp.write(js_code)
-        tmp_path = tmp.name
-        
-    try:
-        subprocess.run(['node', '--check', tmp_path], capture_output=True, text=True, check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Syntax error in minified code:\n{e.stderr}")
+    error = _get_node_checker().check(js_code)
+    if error is not None:
+        origin = f" from {source}" if source else ""
+        logger.error(f"Syntax error in minified code{origin}:\n{error}")
         return False
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+    return True
 
 
-def minify_code(js_code, wrap=True):
+def _quote_utf8(match):
     """
-    Minifies JavaScript code and converts it to a bookmarklet string.
+    Percent-encodes every UTF-8 byte of a _NON_ASCII match.
+    """
+    return "%" + match.group().encode("utf-8").hex("%").upper()
+
+
+def _quote(text):
+    """
+    Percent-encodes text, keeping SAFE_CHARS as-is.
+
+    Equivalent to ``urllib.parse.quote(text, safe=SAFE_CHARS)``, but unsafe
+    ASCII chars are escaped with C-level ``str.replace`` calls for only the
+    chars that are present, and runs of non-ASCII chars are hex-encoded
+    whole, instead of a Python-level loop over every byte.
+    """
+    for char, escape in _ASCII_ESCAPES:
+        if char in text:
+            text = text.replace(char, escape)
+    if not text.isascii():
+        text = _NON_ASCII.sub(_quote_utf8, text)
+    return text
+
+
+def _is_escaped(js_code, index):
+    """
+    Returns True if an odd number of backslashes precede js_code[index].
+    """
+    backslash = index
+    while backslash > 0 and js_code[backslash - 1] == "\\":
+        backslash -= 1
+    return (index - backslash) % 2 == 1
+
+
+def _skip_string(js_code, start):
+    """
+    Returns the index after the string literal starting at js_code[start].
+
+    Only template literals and line continuations can span lines; an
+    unterminated ' or " string ends at the end of its line. Newlines are
+    only looked for up to the next quote, so a long line is not rescanned
+    for every string on it.
+    """
+    quote = js_code[start]
+    i = start + 1
+    while True:
+        end = js_code.find(quote, i)
+        stop = len(js_code) if end < 0 else end
+        if quote != "`":
+            newline = js_code.find("\n", i, stop)
+            while newline >= 0:
+                # A backslash before the newline (or \r\n) continues the line
+                eol = newline - 1 if js_code[newline - 1] == "\r" else newline
+                if not _is_escaped(js_code, eol):
+                    return newline
+                newline = js_code.find("\n", newline + 1, stop)
+        if end < 0:
+            return stop
+        if not _is_escaped(js_code, end):
+            return end + 1
+        i = end + 1
+
+
+def _word_before(js_code, end):
     """
-    # 1. Basic Minification: Remove single-line comments
-    # Use lookbehind to ensure // is not preceded by : (to avoid matching URLs like https://)
-    minified = re.sub(r"(?<!:)//.*", "", js_code)
+    Returns (start, word) for the identifier or number that ends before
+    js_code[end], ignoring whitespace. word is "" if there is none.
+    """
+    i = end - 1
+    while i >= 0 and js_code[i] in " \t\r\n":
+        i -= 1
+    word_end = i + 1
+    while i >= 0 and (js_code[i].isalnum() or js_code[i] in "_$"):
+        i -= 1
+    return i + 1, js_code[i + 1 : word_end]
 
-    # 2. Remove multi-line comments
-    minified = re.sub(r"/\*[\s\S]*?\*/", "", minified)
 
-    # 3. Collapse multiple whitespaces and newlines into a single space
-    minified = re.sub(r"\s+", " ", minified)
+def _skip_regex(js_code, start):
+    """
+    Returns the index after the regex literal starting at js_code[start],
+    or start + 1 if the / there is a division operator.
 
-    # 4. Remove spaces around structural characters
-    minified = re.sub(r"\s*([\{\}\(\)\[\]\=\+\-\*\/\;\:\,\<\>])\s*", r"\1", minified)
+    An unterminated regex literal is a syntax error, so the rest of its
+    line is skipped rather than rescanned from each / after it.
+    """
+    word_start, word = _word_before(js_code, start)
+    i = word_start - 1
+    if word:
+        # A / after an identifier or number is a division, unless the
+        # identifier is a keyword like return or typeof (and not a property)
+        if word not in _REGEX_KEYWORDS or js_code[i : i + 1] == ".":
+            return start + 1
+    elif i >= 0 and js_code[i] == ")":
+        # A / after the ) of if (...), while (...), for (...) or with (...)
+        # starts the statement body; after any other ) it is a division
+        depth = 0
+        while i >= 0:
+            if js_code[i] == ")":
+                depth += 1
+            elif js_code[i] == "(":
+                depth -= 1
+                if depth == 0:
+                    break
+            i -= 1
+        if i < 0:
+            return start + 1
+        word_start, word = _word_before(js_code, i)
+        if word not in _PAREN_KEYWORDS or js_code[word_start - 1 : word_start] == ".":
+            return start + 1
+    elif i >= 0 and (
+        js_code[i] not in _REGEX_PRECEDERS
+        # A / after postfix ++ or -- is a division
+        or js_code[i] in "+-" and js_code[i - 1 : i] == js_code[i]
+    ):
+        return start + 1
+    in_class = False
+    i = start + 1
+    while i < len(js_code):
+        char = js_code[i]
+        if char == "\\":
+            i += 1
+        elif char == "\n":
+            break
+        elif char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            return i + 1
+        i += 1
+    return i
+
+
+def _strip_comments(js_code):
+    """
+    Removes // and /* */ comments from JavaScript code.
+
+    Comment markers inside string and regex literals are left alone.
+    The next comment or literal is found with str.find, so the code in
+    between is skipped in C rather than walked char by char.
+    """
+    # Index of the next occurrence of each char that starts a comment or literal
+    next_index = {char: js_code.find(char) for char in "/'\"`"}
+    pieces = []
+    copied = 0  # js_code[:copied] has been added to pieces
+    i = 0
+    while True:
+        for char, index in next_index.items():
+            if 0 <= index < i:
+                next_index[char] = js_code.find(char, i)
+        i = min((index for index in next_index.values() if index >= 0), default=-1)
+        if i < 0:
+            break
+        if js_code.startswith("//", i):
+            # Keep the newline that ends the comment
+            end = js_code.find("\n", i)
+            if end < 0:
+                end = len(js_code)
+            pieces.append(js_code[copied:i])
+            copied = i = end
+        elif js_code.startswith("/*", i):
+            end = js_code.find("*/", i + 2)
+            if end < 0:
+                break
+            # A comment separates tokens like whitespace does
+            pieces.append(js_code[copied:i])
+            pieces.append(" ")
+            copied = i = end + 2
+        elif js_code[i] == "/":
+            i = _skip_regex(js_code, i)
+        else:
+            i = _skip_string(js_code, i)
+    pieces.append(js_code[copied:])
+    return "".join(pieces)
+
+
+def _minify_gap(match):
+    """
+    Replaces a _MINIFY match with its structural char, or a single space.
+    """
+    return match.group(1) or match.group(2) or " "
+
+
+def minify_js(js_code, wrap=True):
+    """
+    Minifies JavaScript code, without URL encoding it.
+    """
+    # 1. Remove comments, if there are any
+    if "//" in js_code or "/*" in js_code:
+        js_code = _strip_comments(js_code)
+
+    # 2. Collapse whitespace into a single space, and remove spaces around
+    # structural characters, in one pass
+    minified = _MINIFY.sub(_minify_gap, js_code)
 
     # Remove 'javascript:' prefix if present, to avoid double prefixing
     minified = minified.strip()
@@ -77,72 +383,90 @@ def minify_code(js_code, wrap=True):
         minified = minified[11:]
 
     if wrap:
-        minified = f"void((function(){{{minified}}})())"
+        minified = "void((function(){" + minified + "})())"
+
+    return minified
+
 
-    # 5. URL Encode special characters (keeping essential JS safe)
+def to_bookmarklet(minified):
+    """
+    Converts minified JavaScript code to a bookmarklet string.
+    """
+    # 3. URL Encode special characters (keeping essential JS safe)
     # We use quote to ensure characters like '#' or ' ' are browser-safe
     # We preserve common JS characters to keep the bookmarklet readable and shorter
-    bookmarklet = "javascript:" + urllib.parse.quote(minified.strip(), safe=SAFE_CHARS)
-    return bookmarklet
+    return "javascript:" + _quote(minified)
+
+
+def minify_code(js_code, wrap=True):
+    """
+    Minifies JavaScript code and converts it to a bookmarklet string.
+    """
+    return to_bookmarklet(minify_js(js_code, wrap=wrap))
+
+
+def _detect_clipboard():
+    """
+    Returns the command for copying stdin to the clipboard, or None.
+    """
+    if sys.platform == "darwin":
+        return ["pbcopy"]
+    elif sys.platform == "win32":
+        return ["clip"]
+    elif sys.platform.startswith("linux"):
+        if shutil.which("xclip"):
+            return ["xclip", "-selection", "clipboard"]
+        elif shutil.which("xsel"):
+            return ["xsel", "--clipboard", "--input"]
+        elif shutil.which("wl-copy"):
+            return ["wl-copy"]
+    return None
+
+
+# Clipboard command, probed once at import rather than on every copy
+_CLIPBOARD_CMD = _detect_clipboard()
 
 
 def copy_to_clipboard(text):
     """
     Copies text to the clipboard using available system tools.
     """
+    if _CLIPBOARD_CMD is None:
+        return False
     try:
-        if sys.platform == "darwin":
-            subprocess.run(["pbcopy"], input=text, text=True, check=True)
-            return True
-        elif sys.platform == "win32":
-            subprocess.run(["clip"], input=text, text=True, check=True)
-            return True
-        elif sys.platform.startswith("linux"):
-            if shutil.which("xclip"):
-                subprocess.run(
-                    ["xclip", "-selection", "clipboard"],
-                    input=text,
-                    text=True,
-                    check=True,
-                )
-                return True
-            elif shutil.which("xsel"):
-                subprocess.run(
-                    ["xsel", "--clipboard", "--input"],
-                    input=text,
-                    text=True,
-                    check=True,
-                )
-                return True
-            elif shutil.which("wl-copy"):
-                subprocess.run(["wl-copy"], input=text, text=True, check=True)
-                return True
+        subprocess.run(_CLIPBOARD_CMD, input=text, text=True, check=True)
+        return True
     except Exception as e:
         logger.warning(f"Could not copy to clipboard: {e}")
     return False
 
 
-def minify_bookmarklet(input_file, output_file, to_clipboard=False, check_js=True, wrap=True):
-    try:
-        logger.info(f"Reading from {input_file}")
-        with open(input_file, "r") as f:
-            js_code = f.read()
+def _minify_to_file(input_file, output_file, check_js=True, wrap=True):
+    """
+    Minifies input_file to a bookmarklet and writes it to output_file.
 
-        bookmarklet = minify_code(js_code, wrap=wrap)
+    Returns the bookmarklet, or None if the syntax check failed.
+    """
+    logger.info(f"Reading from {input_file}")
+    js_code = pathlib.Path(input_file).read_text(encoding="utf-8")
 
-        if check_js:
-            # Extract code to check
-            if bookmarklet.startswith("javascript:"):
-                code_to_check = urllib.parse.unquote(bookmarklet[11:])
-            else:
-                code_to_check = bookmarklet
-            
-            if not check_syntax(code_to_check):
-                sys.exit(1)
+    minified = minify_js(js_code, wrap=wrap)
 
-        logger.info(f"Writing to {output_file}")
-        with open(output_file, "w") as f:
-            f.write(bookmarklet)
+    # Check the minified code before it is URL encoded
+    if check_js and not check_syntax(minified, input_file):
+        return None
+
+    bookmarklet = to_bookmarklet(minified)
+    logger.info(f"Writing to {output_file}")
+    pathlib.Path(output_file).write_text(bookmarklet, encoding="utf-8")
+    return bookmarklet
+
+
+def minify_bookmarklet(input_file, output_file, to_clipboard=False, check_js=True, wrap=True):
+    try:
+        bookmarklet = _minify_to_file(input_file, output_file, check_js, wrap)
+        if bookmarklet is None:
+            sys.exit(1)
 
         logger.info(f"Success! Minified bookmarklet saved to {output_file}")
 
@@ -167,6 +491,65 @@ def minify_bookmarklet(input_file, output_file, to_clipboard=False, check_js=Tru
         sys.exit(1)
 
 
+def _minify_file(input_file, check_js=True, wrap=True):
+    """
+    Minifies input_file to a bookmarklet in a .min.js file next to it.
+
+    Returns the output path, or None if the syntax check failed.
+    """
+    output_path = pathlib.Path(input_file).with_suffix(".min.js")
+    if _minify_to_file(input_file, output_path, check_js, wrap) is None:
+        return None
+    return output_path
+
+
+def minify_many(input_files, jobs=None, check_js=True, wrap=True):
+    """
+    Minifies each input file to a .min.js file, in parallel worker processes.
+
+    Files that are already .min.js outputs, e.g. from a shell glob over a
+    directory that was minified before, are skipped with a warning.
+    """
+    for input_file in input_files:
+        if str(input_file).endswith(".min.js"):
+            logger.warning(f"Skipping already minified file {input_file}")
+    input_files = [f for f in input_files if not str(f).endswith(".min.js")]
+    minify_file = functools.partial(_minify_file, check_js=check_js, wrap=wrap)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            output_paths = list(executor.map(minify_file, input_files))
+
+        failed = False
+        for input_file, output_path in zip(input_files, output_paths):
+            if output_path is None:
+                logger.error(f"Syntax check failed for {input_file}")
+                failed = True
+            else:
+                logger.info(f"Minified {input_file} to {output_path}")
+        if failed:
+            sys.exit(1)
+
+    except FileNotFoundError as e:
+        logger.error(f"File not found: {e.filename}")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        sys.exit(1)
+
+
+def _positive_int(value):
+    """
+    argparse type for a count that must be at least 1.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer: {value!r}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Minify a JavaScript file into a bookmarklet."
@@ -175,13 +558,11 @@ def main():
         "input_file",
         help="Path to the input JavaScript file",
         nargs="?",
-        default="srchq-bookmarklet.js",
     )
     parser.add_argument(
         "output_file",
         help="Path to the output minified file",
         nargs="?",
-        default="srchq-bookmarklet.min.js",
     )
     parser.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose logging"
@@ -204,15 +585,40 @@ def main():
         default=True,
         help="Wrap the bookmarklet code in void((function(){ ... })())",
     )
+    parser.add_argument(
+        "-b",
+        "--batch",
+        nargs="+",
+        metavar="FILE",
+        help="Minify each FILE to a .min.js file next to it, instead of input_file",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of worker processes for --batch (default: number of CPUs)",
+    )
 
     args = parser.parse_args()
 
     if args.verbose:
         logger.setLevel(logging.DEBUG)
 
-    minify_bookmarklet(
-        args.input_file, args.output_file, args.clipboard, args.check_js, args.wrap
-    )
+    if args.batch:
+        if args.input_file or args.output_file or args.clipboard:
+            parser.error(
+                "--batch cannot be combined with input_file, output_file or --clipboard"
+            )
+        minify_many(args.batch, args.jobs, args.check_js, args.wrap)
+    else:
+        minify_bookmarklet(
+            args.input_file or "srchq-bookmarklet.js",
+            args.output_file or "srchq-bookmarklet.min.js",
+            args.clipboard,
+            args.check_js,
+            args.wrap,
+        )
 
 
 if __name__ == "__main__":  # pragma: no cover
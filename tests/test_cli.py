@@ -7,21 +7,35 @@ import sys
 import shutil
 import os
 import glob
-import subprocess
+import pathlib
 import argparse
+import concurrent.futures
 from minifylet.cli import (
     minify_code,
+    minify_js,
+    to_bookmarklet,
     copy_to_clipboard,
     check_syntax,
     minify_bookmarklet,
+    minify_many,
     main,
     SAFE_CHARS,
+    _quote,
+    _detect_clipboard,
+    _get_node_checker,
+    _NodeChecker,
+    _strip_comments,
 )
 
 
 @pytest.fixture
-def mock_open_file(mocker):
-    return mocker.patch("builtins.open", mocker.mock_open(read_data="var x = 1;"))
+def mock_read_file(mocker):
+    return mocker.patch("pathlib.Path.read_text", return_value="var x = 1;")
+
+
+@pytest.fixture
+def mock_write_file(mocker):
+    return mocker.patch("pathlib.Path.write_text", autospec=True)
 
 
 @pytest.fixture
@@ -58,6 +72,13 @@ def mock_exit(mocker):
         ("javascript:(function(){})();", "(function(){})();", False),
         ("var color = '#fff';", "var color='#fff';", False),
         ('var url = "https://google.com";', 'var url="https://google.com";', False),
+        (
+            'var url = "https://google.com"; // https://example.com',
+            'var url="https://google.com";',
+            False,
+        ),
+        ("var z = x / y;", "var z=x/y;", False),
+        ('let s = "//not a comment";', 'let s="//not a comment";', False),
         ("alert(1);", "void((function(){alert(1);})())", True),
     ],
 )
@@ -69,6 +90,63 @@ def test_minify_code_scenarios(js_code, expected_inner, wrap):
         assert "%23" in minify_code(js_code, wrap=wrap)
 
 
+@pytest.mark.parametrize(
+    "js_code, expected",
+    [
+        ("var x = 1; // comment\ny", "var x = 1; \ny"),
+        ("a /* c */ b", "a   b"),
+        ("/* unterminated", "/* unterminated"),
+        ('var s = "//not a comment"; // c', 'var s = "//not a comment"; '),
+        ("var s = 'it\\'s /* here */'; x", "var s = 'it\\'s /* here */'; x"),
+        ('var s = "a\\\\"; // c', 'var s = "a\\\\"; '),
+        ("var t = `a\n// b`; // c", "var t = `a\n// b`; "),
+        ("var q = 'unterminated\n// c\nz", "var q = 'unterminated\n\nz"),
+        ("var q = 'unterminated", "var q = 'unterminated"),
+        ("s.replace(/'/g, ''); // c", "s.replace(/'/g, ''); "),
+        ("r = /[/'\"]/g; // c", "r = /[/'\"]/g; "),
+        ("r = /a\\/'/; // c", "r = /a\\/'/; "),
+        ("r = /'\n// c", "r = /'\n"),
+        ("x = a / b; // c", "x = a / b; "),
+        ("x = i++ / 2; // c", "x = i++ / 2; "),
+        ("s = 'a\\\nb // c'; // c", "s = 'a\\\nb // c'; "),
+        ("s = 'a\\\r\nb // c'; // c", "s = 'a\\\r\nb // c'; "),
+        ("s = 'a\\\\\n// c", "s = 'a\\\\\n"),
+        ("return /'/.test(s); // c\nfoo();", "return /'/.test(s); \nfoo();"),
+        ("if (typeof /'/ == t) {} // c", "if (typeof /'/ == t) {} "),
+        ("x = a.return / 2; // c", "x = a.return / 2; "),
+        ("x = y1 / 2; // c", "x = y1 / 2; "),
+        ("if (x) /'/.test(s); // c\ny();\n", "if (x) /'/.test(s); \ny();\n"),
+        ("for (x of /'/.exec(s)) y(); // c", "for (x of /'/.exec(s)) y(); "),
+        ("while (f(a)) /'/.test(s); // c", "while (f(a)) /'/.test(s); "),
+        ("x = (a + b) / 2; // '\ny();", "x = (a + b) / 2; \ny();"),
+        ("x = a.if(b) / 2; // '\ny();", "x = a.if(b) / 2; \ny();"),
+        ("x = b) / 2; // '\ny();", "x = b) / 2; \ny();"),
+        ("x = +/a/.test(s); // c", "x = +/a/.test(s); "),
+        ("r = /[a // c\ny // c", "r = /[a // c\ny "),
+        ("/'/.test(s); // c", "/'/.test(s); "),
+    ],
+)
+def test_strip_comments(js_code, expected):
+    """Test comments are removed, but not from string or regex literals."""
+    assert _strip_comments(js_code) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "var x=1;",
+        "var x = 1;",
+        "var pct='100%';var color='#fff';",
+        "a\tb\nc\x7f",
+        "alert('caf\u00e9 \u2603');",
+        "var s='100% \u65e5\u672c\u8a9e';",
+    ],
+)
+def test_quote_matches_urllib(text):
+    """_quote should produce the same output as urllib.parse.quote."""
+    assert _quote(text) == urllib.parse.quote(text, safe=SAFE_CHARS)
+
+
 @pytest.mark.skipif(not shutil.which("node"), reason="Node.js not installed")
 @pytest.mark.parametrize(
     "filepath",
@@ -79,31 +157,19 @@ def test_bookmarklet_syntax(filepath):
     with open(filepath, "r") as f:
         js_code = f.read()
 
-    minified_url = minify_code(js_code)
-    code_to_check = (
-        urllib.parse.unquote(minified_url[11:])
-        if minified_url.startswith("javascript:")
-        else minified_url
-    )
-    assert check_syntax(code_to_check), f"Syntax error for {os.path.basename(filepath)}"
+    minified = minify_js(js_code)
+    assert to_bookmarklet(minified) == minify_code(js_code)
+    assert check_syntax(minified), f"Syntax error for {os.path.basename(filepath)}"
 
 
-def test_check_syntax_tempfile_cleanup(mocker):
-    """Verify check_syntax creates/removes temp files correctly."""
+def test_check_syntax_valid(mocker):
+    """Should return True if the node checker reports no error."""
     mocker.patch("shutil.which", return_value="/usr/bin/node")
-    mock_run = mocker.patch("subprocess.run")
+    mock_checker = mocker.patch("minifylet.cli._get_node_checker").return_value
+    mock_checker.check.return_value = None
 
-    check_syntax("code")
-
-    # Verify subprocess called with a temp file ending in .js
-    assert mock_run.called
-    args = mock_run.call_args[0][0]
-    assert args[0] == "node"
-    assert args[1] == "--check"
-    temp_path = args[2]
-    assert temp_path.endswith(".js")
-    # File should be deleted by the time check_syntax returns
-    assert not os.path.exists(temp_path)
+    assert check_syntax("code") is True
+    mock_checker.check.assert_called_once_with("code")
 
 
 def test_check_syntax_node_missing(mocker):
@@ -115,11 +181,95 @@ def test_check_syntax_node_missing(mocker):
 def test_check_syntax_error(mocker):
     """Should return False on node syntax check failure."""
     mocker.patch("shutil.which", return_value="/usr/bin/node")
-    mocker.patch(
-        "subprocess.run",
-        side_effect=subprocess.CalledProcessError(1, "node", stderr="Syntax Error"),
-    )
+    mock_checker = mocker.patch("minifylet.cli._get_node_checker").return_value
+    mock_checker.check.return_value = "SyntaxError: Unexpected identifier"
+    mock_logger = mocker.patch("minifylet.cli.logger")
     assert check_syntax("invalid code") is False
+    assert "minified code:" in mock_logger.error.call_args.args[0]
+
+    assert check_syntax("invalid code", "in.js") is False
+    assert "minified code from in.js:" in mock_logger.error.call_args.args[0]
+
+
+def test_get_node_checker_reused(mocker):
+    """Verify one node checker process is started and reused."""
+    mocker.patch("minifylet.cli._node_checker", None)
+    mock_checker_cls = mocker.patch("minifylet.cli._NodeChecker")
+    mock_register = mocker.patch("atexit.register")
+    mock_checker_cls.return_value.process.poll.return_value = None
+
+    assert _get_node_checker() is _get_node_checker()
+    mock_checker_cls.assert_called_once_with()
+    mock_register.assert_called_once_with(mock_checker_cls.return_value.close)
+
+
+def test_get_node_checker_after_fork(mocker):
+    """Verify a forked child starts its own node checker."""
+    mocker.patch("minifylet.cli._node_checker", None)
+    mock_checker_cls = mocker.patch("minifylet.cli._NodeChecker")
+    mocker.patch("atexit.register")
+    checkers = [mocker.Mock(), mocker.Mock()]
+    for checker in checkers:
+        checker.process.poll.return_value = None
+    mock_checker_cls.side_effect = checkers
+    mock_getpid = mocker.patch("os.getpid", return_value=100)
+
+    parent_checker = _get_node_checker()
+    assert _get_node_checker() is parent_checker
+    mock_getpid.return_value = 101
+    assert _get_node_checker() is not parent_checker
+    assert mock_checker_cls.call_count == 2
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="Node.js not installed")
+def test_check_syntax_restarts_exited_checker(mocker):
+    """Verify the next check starts a fresh node process after it exits."""
+    mocker.patch("minifylet.cli._node_checker", None)
+    mocker.patch("atexit.register")
+    checker = _get_node_checker()
+    try:
+        checker.process.kill()
+        checker.process.wait()
+
+        assert check_syntax("var x=1;")
+        assert _get_node_checker() is not checker
+    finally:
+        checker.close()
+        _get_node_checker().close()
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="Node.js not installed")
+@pytest.mark.parametrize(
+    "js_code, valid",
+    [
+        ("var x=1;", True),
+        ("var s='caf\u00e9';", True),
+        ("return 1;", True),
+        ("var x=;", False),
+        ("var s='a\nb';", False),
+        ("if(x){", False),
+    ],
+)
+def test_node_checker(js_code, valid):
+    """Integration test: check several snippets with one node process."""
+    with _NodeChecker() as checker:
+        for _ in range(2):
+            error = checker.check(js_code)
+            if valid:
+                assert error is None
+            else:
+                assert error.startswith("SyntaxError")
+    assert checker.process.stdout.closed
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="Node.js not installed")
+def test_node_checker_exited():
+    """Should raise if the node process is gone."""
+    with _NodeChecker() as checker:
+        checker.process.kill()
+        checker.process.wait()
+        with pytest.raises(RuntimeError):
+            checker.check("var x=1;")
 
 
 def test_copy_to_clipboard_integration():
@@ -148,21 +298,41 @@ def test_copy_to_clipboard_integration():
         ("linux", "xclip", ["xclip", "-selection", "clipboard"]),
         ("linux", "xsel", ["xsel", "--clipboard", "--input"]),
         ("linux", "wl-copy", ["wl-copy"]),
+        ("linux", None, None),
+        ("sunos5", None, None),
     ],
 )
-def test_copy_to_clipboard_success(mocker, platform, tool, cmd):
-    """Test clipboard command invocation for different platforms."""
+def test_detect_clipboard(mocker, platform, tool, cmd):
+    """Test clipboard command detection for different platforms."""
     mocker.patch("sys.platform", platform)
     mocker.patch("shutil.which", side_effect=lambda x: x == tool)
+
+    assert _detect_clipboard() == cmd
+
+
+def test_copy_to_clipboard_success(mocker):
+    """Test the detected clipboard command is invoked."""
+    mocker.patch("minifylet.cli._CLIPBOARD_CMD", ["xclip", "-selection", "clipboard"])
     mock_run = mocker.patch("subprocess.run")
 
     assert copy_to_clipboard("text") is True
-    mock_run.assert_called_with(cmd, input="text", text=True, check=True)
+    mock_run.assert_called_with(
+        ["xclip", "-selection", "clipboard"], input="text", text=True, check=True
+    )
+
+
+def test_copy_to_clipboard_no_tool(mocker):
+    """Should return False without running anything if no tool was found."""
+    mocker.patch("minifylet.cli._CLIPBOARD_CMD", None)
+    mock_run = mocker.patch("subprocess.run")
+
+    assert copy_to_clipboard("text") is False
+    mock_run.assert_not_called()
 
 
 def test_copy_to_clipboard_failure(mocker):
     """Should return False upon exception."""
-    mocker.patch("sys.platform", "darwin")
+    mocker.patch("minifylet.cli._CLIPBOARD_CMD", ["pbcopy"])
     mocker.patch("subprocess.run", side_effect=Exception("Copy failed"))
     assert copy_to_clipboard("text") is False
 
@@ -176,7 +346,7 @@ def test_copy_to_clipboard_failure(mocker):
     ],
 )
 def test_minify_bookmarklet_execution(
-    mocker, mock_open_file, to_clipboard, copy_result, expect_warning
+    mocker, mock_read_file, mock_write_file, to_clipboard, copy_result, expect_warning
 ):
     """Verify minify_bookmarklet workflow, including file I/O and clipboard logic."""
     mocker.patch("minifylet.cli.check_syntax", return_value=True)
@@ -190,7 +360,10 @@ def test_minify_bookmarklet_execution(
         "in.js", "out.js", to_clipboard=to_clipboard, check_js=True, wrap=True
     )
 
-    mock_open_file.assert_called_with("out.js", "w")
+    mock_read_file.assert_called_with(encoding="utf-8")
+    mock_write_file.assert_called_with(
+        pathlib.Path("out.js"), mocker.ANY, encoding="utf-8"
+    )
     if to_clipboard:
         mock_copy.assert_called()
     else:
@@ -209,30 +382,115 @@ def test_minify_bookmarklet_execution(
 )
 def test_minify_bookmarklet_exceptions(mock_exit, mocker, exception, expected_exit):
     """Verify correct exit codes on file/disk errors."""
-    mocker.patch("builtins.open", side_effect=exception)
+    mocker.patch("pathlib.Path.read_text", side_effect=exception)
     mocker.patch("minifylet.cli.logger")
     minify_bookmarklet("in.js", "out.js")
     mock_exit.assert_called_with(expected_exit)
 
 
-def test_minify_bookmarklet_syntax_fail(mock_exit, mocker):
+def test_minify_bookmarklet_syntax_fail(mock_exit, mock_write_file, mocker):
     """Should exit if syntax check fails."""
-    mocker.patch("builtins.open", mocker.mock_open(read_data="bad code"))
+    mocker.patch("pathlib.Path.read_text", return_value="bad code")
     mocker.patch("minifylet.cli.check_syntax", return_value=False)
 
     minify_bookmarklet("in.js", "out.js", check_js=True)
     mock_exit.assert_called_with(1)
+    mock_write_file.assert_not_called()
 
 
-def test_minify_bookmarklet_no_javascript_prefix(mocker):
-    """Verify logic for extracting code to check when 'javascript:' prefix differs."""
-    mocker.patch("builtins.open", mocker.mock_open(read_data="var x = 1;"))
+def test_minify_bookmarklet_checks_unencoded_js(mocker, mock_read_file, mock_write_file):
+    """Verify the syntax check gets the minified code, not the URL encoded bookmarklet."""
     mock_check = mocker.patch("minifylet.cli.check_syntax", return_value=True)
-    mocker.patch("minifylet.cli.minify_code", return_value="raw_code")
     mocker.patch("minifylet.cli.sys.stderr")
 
     minify_bookmarklet("in.js", "out.js", check_js=True)
-    mock_check.assert_called_with("raw_code")
+    mock_check.assert_called_with("void((function(){var x=1;})())", "in.js")
+
+
+def test_minify_many(tmp_path):
+    """Verify minify_many writes a .min.js file next to each input file."""
+    input_files = []
+    for name in ["a", "b"]:
+        input_file = tmp_path / f"{name}-bookmarklet.js"
+        input_file.write_text(f"var {name} = 1;", encoding="utf-8")
+        input_files.append(str(input_file))
+
+    minify_many(input_files, jobs=2, check_js=False, wrap=False)
+
+    assert (tmp_path / "a-bookmarklet.min.js").read_text() == minify_code(
+        "var a = 1;", wrap=False
+    )
+    assert (tmp_path / "b-bookmarklet.min.js").read_text() == minify_code(
+        "var b = 1;", wrap=False
+    )
+
+
+def test_minify_many_skips_min_js(mocker, tmp_path):
+    """Verify minify_many skips .min.js files picked up by a glob."""
+    mock_logger = mocker.patch("minifylet.cli.logger")
+    (tmp_path / "a.js").write_text("var a = 1;", encoding="utf-8")
+    (tmp_path / "a.min.js").write_text("javascript:var%20a=1;", encoding="utf-8")
+
+    minify_many(sorted(glob.glob(str(tmp_path / "*.js"))), check_js=False)
+
+    assert (tmp_path / "a.min.js").read_text() == minify_code("var a = 1;")
+    assert not (tmp_path / "a.min.min.js").exists()
+    mock_logger.warning.assert_called_once_with(
+        f"Skipping already minified file {tmp_path / 'a.min.js'}"
+    )
+
+
+@pytest.mark.skipif(not shutil.which("node"), reason="Node.js not installed")
+def test_minify_many_after_check_syntax(tmp_path):
+    """Verify forked workers don't share the parent's node checker."""
+    assert check_syntax("var x=1;")
+    input_files = []
+    for n in range(16):
+        input_file = tmp_path / f"{n}-bookmarklet.js"
+        input_file.write_text(f"var x{n} = 1;" * 200, encoding="utf-8")
+        input_files.append(str(input_file))
+
+    minify_many(input_files, jobs=4, check_js=True, wrap=False)
+
+    for n in range(16):
+        assert (tmp_path / f"{n}-bookmarklet.min.js").exists()
+    assert check_syntax("var x=1;")
+
+
+def test_minify_many_syntax_fail(mock_exit, mocker, tmp_path):
+    """Should exit if the syntax check fails for any file."""
+    # Run in threads so that the check_syntax mock applies
+    mocker.patch(
+        "concurrent.futures.ProcessPoolExecutor", concurrent.futures.ThreadPoolExecutor
+    )
+    mocker.patch("minifylet.cli.check_syntax", side_effect=lambda code, source: "good" in code)
+    mocker.patch("minifylet.cli.logger")
+    (tmp_path / "good.js").write_text("good();", encoding="utf-8")
+    (tmp_path / "bad.js").write_text("bad();", encoding="utf-8")
+
+    minify_many([str(tmp_path / "good.js"), str(tmp_path / "bad.js")])
+
+    mock_exit.assert_called_with(1)
+    assert (tmp_path / "good.min.js").exists()
+    assert not (tmp_path / "bad.min.js").exists()
+
+
+@pytest.mark.parametrize(
+    "exception, expected_exit",
+    [
+        (FileNotFoundError, 1),
+        (Exception("Disk error"), 1),
+    ],
+)
+def test_minify_many_exceptions(mock_exit, mocker, exception, expected_exit):
+    """Verify correct exit codes on file/disk errors."""
+    mocker.patch(
+        "concurrent.futures.ProcessPoolExecutor", concurrent.futures.ThreadPoolExecutor
+    )
+    mocker.patch("pathlib.Path.read_text", side_effect=exception)
+    mocker.patch("minifylet.cli.logger")
+    minify_many(["in.js"])
+    mock_exit.assert_called_with(expected_exit)
 
 
 @pytest.mark.parametrize(
@@ -255,6 +513,8 @@ def test_main(mocker, verbose, set_level_called):
         clipboard=False,
         check_js=True,
         wrap=True,
+        batch=None,
+        jobs=None,
     )
     main()
     mock_minify.assert_called_with("in.js", "out.js", False, True, True)
@@ -262,3 +522,91 @@ def test_main(mocker, verbose, set_level_called):
         mock_logger.setLevel.assert_called()
     else:
         mock_logger.setLevel.assert_not_called()
+
+
+def test_main_batch(mocker):
+    """Verify main dispatches --batch to minify_many."""
+    mock_args = mocker.patch("argparse.ArgumentParser.parse_args")
+    mock_many = mocker.patch("minifylet.cli.minify_many")
+    mock_minify = mocker.patch("minifylet.cli.minify_bookmarklet")
+
+    mock_args.return_value = argparse.Namespace(
+        input_file=None,
+        output_file=None,
+        verbose=False,
+        clipboard=False,
+        check_js=True,
+        wrap=True,
+        batch=["a.js", "b.js"],
+        jobs=2,
+    )
+    main()
+    mock_many.assert_called_with(["a.js", "b.js"], 2, True, True)
+    mock_minify.assert_not_called()
+
+
+def test_main_defaults(mocker):
+    """Verify main falls back to the default input and output files."""
+    mock_args = mocker.patch("argparse.ArgumentParser.parse_args")
+    mock_minify = mocker.patch("minifylet.cli.minify_bookmarklet")
+    mock_args.return_value = argparse.Namespace(
+        input_file=None,
+        output_file=None,
+        verbose=False,
+        clipboard=False,
+        check_js=True,
+        wrap=True,
+        batch=None,
+        jobs=None,
+    )
+
+    main()
+
+    mock_minify.assert_called_with(
+        "srchq-bookmarklet.js", "srchq-bookmarklet.min.js", False, True, True
+    )
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["in.js", "-b", "a.js"],
+        ["in.js", "out.js", "-b", "a.js"],
+        ["-C", "-b", "a.js"],
+    ],
+)
+def test_main_batch_conflicts(mocker, argv):
+    """Verify --batch is rejected with input_file, output_file or --clipboard."""
+    mocker.patch("sys.argv", ["minifylet", *argv])
+    mock_many = mocker.patch("minifylet.cli.minify_many")
+    mocker.patch("sys.stderr")
+
+    with pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == 2
+    mock_many.assert_not_called()
+
+
+@pytest.mark.parametrize("jobs", ["0", "-2", "two"])
+def test_main_jobs_must_be_positive(mocker, capsys, jobs):
+    """Verify -j rejects counts below 1 at parse time."""
+    mocker.patch("sys.argv", ["minifylet", "-j", jobs, "-b", "a.js"])
+    mock_many = mocker.patch("minifylet.cli.minify_many")
+
+    with pytest.raises(SystemExit) as excinfo:
+        main()
+
+    assert excinfo.value.code == 2
+    assert "must be a positive integer" in capsys.readouterr().err
+    mock_many.assert_not_called()
+
+
+def test_main_jobs(mocker):
+    """Verify -j passes a positive worker count to minify_many."""
+    mocker.patch("sys.argv", ["minifylet", "-j", "3", "-b", "a.js"])
+    mock_many = mocker.patch("minifylet.cli.minify_many")
+
+    main()
+
+    mock_many.assert_called_with(["a.js"], 3, True, True)